@@ -4,8 +4,236 @@ Handles rendering of waveforms on a Tkinter canvas
 """
 
 import tkinter as tk
-import re
-from math import log10
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from math import ceil, floor, log2
+from models import Marker
+
+
+# Smallest distance in pixels between two vertical grid lines
+_GRID_MIN_SPACING = 20
+
+
+# Time units with their length in seconds, largest first
+_UNITS_DESC = (
+    ("s", 1),
+    ("ms", 1e-3),
+    ("us", 1e-6),
+    ("ns", 1e-9),
+    ("ps", 1e-12),
+    ("fs", 1e-15),
+)
+_UNITS_ASC = _UNITS_DESC[::-1]
+_UNIT_FACTORS = dict(_UNITS_DESC)
+
+# Candidate grid steps: 1, 2 and 5 times each power of ten, in ascending order
+_NICE_STEPS = tuple(
+    step * 10**power if power >= 0 else step / 10**-power
+    for power in range(-12, 19)
+    for step in (1, 2, 5)
+)
+
+
+def _nice_time_step(raw_step):
+    """Round a raw grid step up to a 1/2/5 multiple of a power of ten"""
+    i = bisect_left(_NICE_STEPS, raw_step)
+    return _NICE_STEPS[min(i, len(_NICE_STEPS) - 1)]
+
+
+@lru_cache(maxsize=4096)
+def _format_grid_time(time_value, timescale_parts, time_base, precision):
+    """Format a grid time label with units, removing trailing zeros
+
+    timescale_parts is the (multiplier, unit) pair of the dump's timescale,
+    or None if it couldn't be parsed. The same labels come back on every
+    redraw at a given zoom, so results are cached.
+    """
+    if timescale_parts is None:
+        return str(int(time_value))
+
+    # Base unit and multiplier (e.g., "1ns" -> 1, "ns")
+    multiplier, base_unit = timescale_parts
+
+    # Calculate actual time in base units
+    actual_time = time_value * multiplier
+
+    # Get the base unit value
+    if base_unit not in _UNIT_FACTORS:
+        return str(int(time_value))
+
+    base_value = _UNIT_FACTORS[base_unit]
+    time_in_seconds = actual_time * base_value
+
+    if time_base != "auto" and time_base in _UNIT_FACTORS:
+        # Use the user-selected time base
+        best_unit = time_base
+        best_value = time_in_seconds / _UNIT_FACTORS[time_base]
+    else:
+        # Auto-select the most appropriate unit
+        best_unit = base_unit
+        best_value = actual_time
+
+        for unit, factor in _UNITS_DESC:
+            converted = time_in_seconds / factor
+            if converted >= 1.0:
+                best_unit = unit
+                best_value = converted
+                break
+
+    # Format the value
+    if best_value == int(best_value) and precision == 0:
+        formatted = f"{int(best_value)}{best_unit}"
+    else:
+        # Format with appropriate precision, then remove trailing zeros
+        formatted = f"{best_value:.{precision}f}".rstrip("0").rstrip(".")
+        formatted = f"{formatted}{best_unit}"
+
+    return formatted
+
+
+# Color class of each value code - low and high share the signal color,
+# x and z are drawn in colors of their own
+_CODE_CLASSES = (0, 0, 1, 2)
+
+
+def build_digital_runs(xs, codes, y_high, y_low, end_x=None):
+    """Build the geometry of a digital waveform from its change positions
+
+    xs and codes are parallel sequences describing consecutive changes, with
+    codes holding the VALUE_* codes of the values. Returns (runs, bursts):
+    runs is a list of (code, points) polylines, one per stretch drawn in the
+    same color as code, with points a flat x/y list; bursts is a list of
+    (x1, x2) spans whose transitions are too dense to draw. When end_x is
+    given the last value is extended up to it.
+    """
+    runs = []
+    bursts = []
+    points = []  # Flat x/y list of the polyline being built
+    run_class = None
+    prev_x = None
+    prev_code = None
+    burst_start = None  # x where the current run of dense transitions began
+
+    # Level of each value code - only low values sit on the low rail
+    y_levels = (y_low, y_high, y_high, y_high)
+
+    for x, code in zip(xs, codes):
+        if prev_code is None:
+            prev_x = x
+            prev_code = code
+            continue
+
+        # Transitions at most one pixel apart can't be told apart, so fold
+        # them into a single activity span instead of drawing each one
+        if x - prev_x <= 1:
+            if burst_start is None:
+                burst_start = prev_x
+            prev_x = x
+            prev_code = code
+            continue
+
+        if burst_start is not None:
+            bursts.append((burst_start, prev_x))
+            points = []
+            burst_start = None
+
+        # Horizontal line at old value level, then vertical transition line
+        code_class = _CODE_CLASSES[prev_code]
+        y_old = y_levels[prev_code]
+        y_new = y_levels[code]
+
+        if code_class != run_class or not points:
+            points = [prev_x, y_old]
+            run_class = code_class
+            runs.append((prev_code, points))
+        points += (x, y_old, x, y_new)
+
+        prev_x = x
+        prev_code = code
+
+    if burst_start is not None:
+        bursts.append((burst_start, prev_x))
+        points = []
+
+    if end_x is not None and prev_code is not None:
+        code_class = _CODE_CLASSES[prev_code]
+        y = y_levels[prev_code]
+
+        if code_class != run_class or not points:
+            points = [prev_x, y]
+            runs.append((prev_code, points))
+        points += (end_x, y)
+
+    return runs, bursts
+
+
+def build_bus_rails(xs, values, y_high, y_low, end_x=None):
+    """Build the geometry of a bus waveform from its change positions
+
+    Returns (rails, labels, bursts): rails is a list of (upper, lower) flat
+    x/y point lists that swap sides at every transition, so together they
+    draw both rails plus the X shape of each transition; labels is a list of
+    (x1, x2, value) segments wide enough to carry a value label; bursts is a
+    list of (x1, x2) spans too dense to draw.
+    """
+    rails = []
+    labels = []
+    bursts = []
+    upper = []
+    lower = []
+    prev_x = None
+    prev_value = None
+    burst_start = None
+
+    for x, value in zip(xs, values):
+        if prev_value is None:
+            prev_x = x
+            prev_value = value
+            continue
+
+        if x - prev_x <= 1:
+            if burst_start is None:
+                burst_start = prev_x
+            prev_x = x
+            prev_value = value
+            continue
+
+        if burst_start is not None:
+            bursts.append((burst_start, prev_x))
+            upper = []
+            burst_start = None
+
+        if not upper:
+            upper = [prev_x, y_high]
+            lower = [prev_x, y_low]
+            rails.append((upper, lower))
+        y_a = upper[-1]
+        y_b = lower[-1]
+        upper += (x - 5, y_a, x + 5, y_b)
+        lower += (x - 5, y_b, x + 5, y_a)
+
+        if x - prev_x > 40:
+            labels.append((prev_x, x, prev_value))
+
+        prev_x = x
+        prev_value = value
+
+    if burst_start is not None:
+        bursts.append((burst_start, prev_x))
+        upper = []
+
+    if end_x is not None and prev_value is not None:
+        if not upper:
+            upper = [prev_x, y_high]
+            lower = [prev_x, y_low]
+            rails.append((upper, lower))
+        upper += (end_x, upper[-1])
+        lower += (end_x, lower[-1])
+
+        if end_x - prev_x > 40:
+            labels.append((prev_x, end_x, prev_value))
+
+    return rails, labels, bursts
 
 
 class WaveformCanvas:
@@ -25,24 +253,31 @@ class WaveformCanvas:
         self.v_scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL)
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        # Signal names live on their own canvas that only scrolls vertically,
+        # so they stay in place while the waveforms scroll and zoom
+        self.label_canvas = tk.Canvas(self.frame, bg="black", highlightthickness=0)
+        self.label_canvas.pack(side=tk.LEFT, fill=tk.Y)
+
         # Canvas
         self.canvas = tk.Canvas(
             self.frame,
             bg="black",
             xscrollcommand=self.h_scrollbar.set,
-            yscrollcommand=self.v_scrollbar.set,
+            yscrollcommand=self._on_yscroll,
         )
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # Configure scrollbars
-        self.h_scrollbar.config(command=self.canvas.xview)
+        self.h_scrollbar.config(command=self._on_xview)
         self.v_scrollbar.config(command=self.canvas.yview)
 
         # Display parameters
         self.time_scale = 1.0  # Pixels per time unit
         self.signal_height = 40
         self.signal_spacing = 10
-        self.left_margin = 200  # Space for signal names
+        self.label_width = 200  # Width of the signal name panel
+        self.left_margin = 20  # Space before time zero
+        self.view_width = 0  # Width of the canvas widget, as of its last resize
 
         # Colors
         self.colors = {
@@ -57,6 +292,10 @@ class WaveformCanvas:
         }
 
         self.canvas.config(bg=self.colors["background"])
+        self.label_canvas.config(width=self.label_width, bg=self.colors["background"])
+
+        # Colors of x and z values, which override the signal's own color
+        self._special_colors = (self.colors["signal_x"], self.colors["signal_z"])
 
         # Mouse drag state for panning and interactions
         self.drag_start_x = None
@@ -67,6 +306,25 @@ class WaveformCanvas:
         )
         self.dragged_marker = None
         self.alt_pressed = False
+        self._drag_canvas_size = (0, 0)  # Canvas size when the pan started
+
+        # Incremental redraw state
+        self._row_tags = {}  # Dict: identifier -> tag shared by a row's items
+        self._signal_rows = {}  # Dict: identifier -> y offset of the signal row
+        self._layout_key = None  # Parameters the current items were drawn with
+        self._geometry_key = None  # Parameters the row contents were drawn with
+        self._layout_width = None  # view_width the current items were laid out for
+        self._canvas_height = 0
+        self._scroll_region = None  # Last scrollregion set, as numbers
+        self._drawn_range = (0, 0)  # Time window covered by the drawn items
+        self._redraw_after_id = None  # Pending deferred redraw, if any
+        self._draw_skipped = False  # Whether a draw was skipped while unmapped
+        self._marker_items = {}  # Dict: Marker -> its canvas item IDs
+        self._cursor_items = None  # Canvas item IDs of the cursor, if drawn
+        self._grid_items = {}  # Dict: (x, label) -> item IDs of a grid tick
+        self._grid_height = 0  # Height the grid lines were drawn with
+        self._overlay_after_id = None  # Pending deferred overlay update, if any
+        self._markers_dirty = False  # Whether that update must redraw markers
 
         # Bind mouse events for panning and interactions
         self.canvas.bind("<ButtonPress-1>", self._on_mouse_down)
@@ -74,6 +332,11 @@ class WaveformCanvas:
         self.canvas.bind("<ButtonRelease-1>", self._on_mouse_up)
         self.canvas.bind("<Double-Button-1>", self._on_double_click)
 
+        # Only the visible part of the timeline is drawn, so resizing may
+        # uncover areas that still need items
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Map>", lambda e: self._on_viewport_change())
+
         # Keyboard events for Alt key
         self.canvas.bind("<KeyPress-Alt_L>", self._on_alt_press)
         self.canvas.bind("<KeyRelease-Alt_L>", self._on_alt_release)
@@ -88,10 +351,16 @@ class WaveformCanvas:
         self.frame.pack(**kwargs)
 
     def draw_waveforms(self):
-        """Draw all visible waveforms"""
-        self.canvas.delete("all")
+        """Draw all visible waveforms, re-emitting only what changed"""
+        # Nothing can be seen before the canvas is mapped and sized, so leave
+        # the drawing to the <Map>/<Configure> event that follows
+        if not self.canvas.winfo_ismapped() or self.canvas.winfo_width() <= 1:
+            self._draw_skipped = True
+            return
+        self._draw_skipped = False
 
         if not self.waveform_data or not self.waveform_data.signals:
+            self._clear()
             return
 
         # Get signals in display order (respects user reordering)
@@ -103,6 +372,7 @@ class WaveformCanvas:
         visible_signals = [s for s in signals if s.visible]
 
         if not visible_signals:
+            self._clear()
             # Draw message when no signals are selected
             self.canvas.create_text(
                 self.canvas.winfo_width() // 2,
@@ -117,54 +387,303 @@ class WaveformCanvas:
         # Calculate canvas size with bounds checking
         max_time = self.waveform_data.max_timestamp
         if max_time <= 0:
+            self._clear()
             return
 
+        # Signal items are kept between calls while everything that affects
+        # their geometry stays the same
+        geometry_key = (self.waveform_data, self.time_scale, max_time)
+        canvas_width = self.canvas.winfo_width()
+        layout_key = geometry_key + (
+            self.waveform_data.time_base,
+            canvas_width,
+            tuple(s.identifier for s in visible_signals),
+        )
+        dirty = self.waveform_data.dirty_signals
+
+        view_lo, view_hi = self._visible_time_range()
+        covered = self._drawn_range[0] <= view_lo and view_hi <= self._drawn_range[1]
+        if layout_key == self._layout_key and covered:
+            # Layout unchanged - only re-emit signals invalidated since last draw
+            self.redraw_signals(s for s in visible_signals if s.identifier in dirty)
+        elif geometry_key == self._geometry_key and covered:
+            # Only rows were shown, hidden or reordered (or the grid changed) -
+            # keep the rows that are already drawn and just move them
+            self._layout_rows(visible_signals, max_time)
+            self.redraw_signals(s for s in visible_signals if s.identifier in dirty)
+            self._layout_key = layout_key
+        else:
+            self._rebuild(visible_signals, max_time)
+            self._layout_key = layout_key
+            self._geometry_key = geometry_key
+
+        self._layout_width = self.view_width
+        dirty.clear()
+        self._draw_overlay()
+
+    def request_redraw(self):
+        """Schedule draw_waveforms for the next idle moment"""
+        # Bursts of requests (scrolling, resizing, zoom steps) collapse into
+        # one redraw that uses whatever state is current when it runs
+        if self._redraw_after_id is None:
+            self._redraw_after_id = self.canvas.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self):
+        """Run a redraw scheduled by request_redraw"""
+        self._redraw_after_id = None
+        self.draw_waveforms()
+
+    def invalidate(self):
+        """Force the next draw_waveforms call to rebuild every item"""
+        self._layout_key = None
+        self._geometry_key = None
+
+    def _clear(self, keep_grid=False):
+        """Remove canvas items and forget the incremental redraw state
+
+        With keep_grid the grid ticks survive, so a rebuild at the same zoom
+        can keep the ones that are still in range.
+        """
+        if keep_grid:
+            self.canvas.delete("!grid")
+        else:
+            self.canvas.delete("all")
+            self._grid_items = {}
+        self.label_canvas.delete("all")
+        self._marker_items = {}
+        self._cursor_items = None
+        self._row_tags = {}
+        self._signal_rows = {}
+        self._layout_key = None
+        self._geometry_key = None
+
+    def _rebuild(self, visible_signals, max_time):
+        """Recreate every visible signal from scratch"""
+        self._clear(keep_grid=True)
+        self._update_scroll_region(visible_signals, max_time)
+
+        # Draw one extra viewport on each side so short scrolls reuse the items
+        view_lo, view_hi = self._visible_time_range()
+        span = view_hi - view_lo
+        self._drawn_range = (view_lo - span, view_hi + span)
+
+        self._layout_rows(visible_signals, max_time)
+
+    def _layout_rows(self, visible_signals, max_time):
+        """Redraw the grid and place signal rows, reusing rows already drawn"""
+        canvas_width, canvas_height = self._update_scroll_region(
+            visible_signals, max_time
+        )
+
+        # Draw time grid behind the signals
+        self._draw_time_grid(max_time, canvas_width, canvas_height)
+        self.canvas.tag_lower("grid")
+
+        # Each row's items share one tag, so a row that only changed position
+        # is shifted with a single move instead of being drawn again
+        old_rows = self._signal_rows
+        self._signal_rows = {}
+        new_rows = []
+        y_offset = 50
+        for signal in visible_signals:
+            old_y = old_rows.pop(signal.identifier, None)
+            if old_y is None:
+                tag = self._row_tag(signal)
+                self._draw_signal_label(signal, y_offset, tag)
+                new_rows.append((signal, y_offset, tag))
+            elif old_y != y_offset:
+                tag = self._row_tag(signal)
+                self.canvas.move(tag, 0, y_offset - old_y)
+                self.label_canvas.move(tag, 0, y_offset - old_y)
+            self._signal_rows[signal.identifier] = y_offset
+            y_offset += self.signal_height + self.signal_spacing
+
+        # Drop rows of signals that are no longer visible
+        for identifier in old_rows:
+            self.canvas.delete(self._row_tags[identifier])
+            self.label_canvas.delete(self._row_tags[identifier])
+
+        self._draw_rows(new_rows)
+        if new_rows:
+            # Keep the overlay above the rows that were just drawn
+            self.canvas.tag_raise("marker")
+            self.canvas.tag_raise("cursor")
+
+    def _update_scroll_region(self, visible_signals, max_time):
+        """Size the scroll region for the visible signals and return it"""
         canvas_width = max(
             200, int(max_time * self.time_scale) + self.left_margin + 100
         )
         canvas_height = max(
             100, len(visible_signals) * (self.signal_height + self.signal_spacing) + 100
         )
+        self._canvas_height = canvas_height
 
-        self.canvas.config(scrollregion=(0, 0, canvas_width, canvas_height))
+        self._scroll_region = (0, 0, canvas_width, canvas_height)
+        self.canvas.config(scrollregion=self._scroll_region)
+        self.label_canvas.config(
+            scrollregion=(0, 0, self.label_width, canvas_height)
+        )
+        return canvas_width, canvas_height
+
+    def _row_tag(self, signal):
+        """Get the canvas tag shared by all items of a signal's row"""
+        tag = self._row_tags.get(signal.identifier)
+        if tag is None:
+            tag = f"row{len(self._row_tags)}"
+            self._row_tags[signal.identifier] = tag
+        return tag
+
+    def redraw_signals(self, signals):
+        """Re-emit the canvas items of the given signals in their current rows"""
+        rows = []
+        for signal in signals:
+            y_offset = self._signal_rows.get(signal.identifier)
+            if y_offset is None:
+                continue
+            tag = self._row_tag(signal)
+            self.canvas.delete(tag)
+            rows.append((signal, y_offset, tag))
+        self._draw_rows(rows)
+
+        # Keep the overlay above freshly created signal items
+        self.canvas.tag_raise("marker")
+        self.canvas.tag_raise("cursor")
+
+    def _visible_time_range(self):
+        """Get the (start, end) time span currently scrolled into view"""
+        # Width as tracked from <Configure>, so scrolling and panning need no
+        # geometry query
+        canvas_width = self.view_width
+        if canvas_width <= 1:
+            canvas_width = 1000
 
-        # Draw time grid
-        self._draw_time_grid(max_time, canvas_width, canvas_height)
+        x_lo = self.canvas.canvasx(0)
+        x_hi = x_lo + canvas_width
+        return self._x_to_time(x_lo), self._x_to_time(x_hi)
+
+    def _on_xview(self, *args):
+        """Scroll horizontally from the scrollbar"""
+        self.canvas.xview(*args)
+        self._on_viewport_change()
+
+    def _on_configure(self, event):
+        """Remember the new canvas size and draw any area it uncovered"""
+        self.view_width = event.width
+        self._on_viewport_change()
+
+    def _on_yscroll(self, first, last):
+        """Keep the scrollbar and label panel in step with vertical scrolling"""
+        self.v_scrollbar.set(first, last)
+        self.label_canvas.yview_moveto(first)
+
+    def _on_viewport_change(self):
+        """Draw newly exposed parts of the timeline after a scroll or resize"""
+        if self._draw_skipped:
+            # The canvas was not mapped when it was last asked to draw
+            self.request_redraw()
+            return
+        if self._layout_key is None:
+            return
 
-        # Draw each signal
-        y_offset = 50
-        for signal in visible_signals:
-            self._draw_signal(signal, y_offset)
-            y_offset += self.signal_height + self.signal_spacing
+        # The grid step depends on the canvas width, so a resize needs a new
+        # layout even when the drawn range still covers the view
+        if self.view_width != self._layout_width:
+            self.request_redraw()
+            return
+
+        view_lo, view_hi = self._visible_time_range()
+        if view_lo < self._drawn_range[0] or view_hi > self._drawn_range[1]:
+            self.request_redraw()
 
+    def _draw_overlay(self):
+        """Redraw markers and cursor on top of the waveforms"""
         # Draw markers
-        self._draw_markers(canvas_height)
+        self._draw_markers(self._canvas_height)
 
         # Draw cursor
-        self._draw_cursor(canvas_height)
+        self._draw_cursor(self._canvas_height)
+
+    def request_overlay(self, markers=True):
+        """Schedule an update of just the markers and cursor when idle
+
+        With markers=False only the cursor is updated.
+        """
+        # Nothing has been laid out to draw the overlay over yet
+        if self._layout_key is None:
+            self.request_redraw()
+            return
+
+        # Motion events can arrive faster than they are drawn, so a burst of
+        # them is coalesced into one update using the latest positions
+        self._markers_dirty = self._markers_dirty or markers
+        if self._overlay_after_id is None:
+            self._overlay_after_id = self.canvas.after_idle(self._flush_overlay)
+
+    def _flush_overlay(self):
+        """Run an overlay update scheduled by request_overlay"""
+        self._overlay_after_id = None
+        if self._markers_dirty:
+            self._markers_dirty = False
+            self._draw_markers(self._canvas_height)
+        self._draw_cursor(self._canvas_height)
 
     def _draw_time_grid(self, max_time, width, height):
-        """Draw time grid and axis"""
+        """Draw time grid and axis, reusing the items of unchanged ticks"""
         # Determine appropriate time step for grid
         time_step = self._calculate_time_step(max_time)
 
-        # Draw vertical grid lines
-        t = 0
-        while t <= max_time:
-            x = self.left_margin + int(t * self.time_scale)
-
-            # Grid line
-            self.canvas.create_line(
-                x, 0, x, height, fill=self.colors["grid"], dash=(2, 4)
-            )
+        # Collect the tick positions inside the drawn time window, then emit
+        # the lines and labels in two passes. Ticks are numbered rather than
+        # accumulated, so the same tick always gets exactly the same time
+        t_lo, t_hi = self._drawn_range
+        first = max(0, ceil(t_lo / time_step))
+        last = floor(min(max_time, t_hi) / time_step)
+        scale = self.time_scale
+        left = self.left_margin
+        ticks = [
+            (t, left + int(t * scale))
+            for t in (k * time_step for k in range(first, last + 1))
+        ]
+
+        # Ticks whose position and label are unchanged keep their items, so
+        # only ticks that scrolled into range are created and laid out
+        create_line = self.canvas.create_line
+        create_text = self.canvas.create_text
+        grid_color = self.colors["grid"]
+        text_color = self.colors["text"]
+        resized = height != self._grid_height
+        self._grid_height = height
+        old_items = self._grid_items
+        self._grid_items = {}
+        for t, x in ticks:
+            label = self._format_time_with_units(t)
+            key = (x, label)
+            items = old_items.pop(key, None)
+            if items is None:
+                items = (
+                    create_line(
+                        x, 0, x, height, fill=grid_color, dash=(2, 4), tags="grid"
+                    ),
+                    create_text(
+                        x,
+                        20,
+                        text=label,
+                        fill=text_color,
+                        font=("Courier", 8),
+                        tags=("grid", "grid_label"),
+                    ),
+                )
+            elif resized:
+                self.canvas.coords(items[0], x, 0, x, height)
+            self._grid_items[key] = items
 
-            # Time label with units
-            time_label = self._format_time_with_units(t)
-            self.canvas.create_text(
-                x, 20, text=time_label, fill=self.colors["text"], font=("Courier", 8)
-            )
+        # Drop ticks that are no longer drawn
+        if old_items:
+            self.canvas.delete(*(i for items in old_items.values() for i in items))
 
-            t += time_step
+        # Keep every label above the lines, including those just created
+        self.canvas.tag_raise("grid_label", "grid")
 
     def _calculate_time_step(self, max_time):
         """Calculate appropriate time step for grid based on zoom level"""
@@ -179,83 +698,14 @@ class WaveformCanvas:
         # Calculate how much time is visible in the current viewport
         visible_time = (canvas_width - self.left_margin) / self.time_scale
 
-        # Aim for 8-12 grid lines in the visible area
-        raw_step = visible_time / 10
-
-        # Handle very small time steps
-        if raw_step < 1:
-            # Find the nearest power of 10
-            magnitude = 10 ** (int(abs(round(log10(raw_step)))) if raw_step > 0 else 0)
-            nice_steps = [0.1, 0.2, 0.5, 1, 2, 5, 10]
-
-            for step in nice_steps:
-                test_step = step / magnitude if magnitude > 1 else step * magnitude
-                if test_step >= raw_step:
-                    return test_step
-            return 1.0 / magnitude
-
-        # For larger time steps, use the original logic
-        magnitude = 10 ** int(len(str(int(raw_step))) - 1)
-        nice_steps = [1, 2, 5, 10]
-
-        for step in nice_steps:
-            if step * magnitude >= raw_step:
-                return step * magnitude
-
-        return magnitude * 10
+        # Aim for 8-12 grid lines in the visible area, but never put lines
+        # closer than _GRID_MIN_SPACING pixels (narrow windows would otherwise
+        # ask for a tiny or even negative step)
+        min_step = _GRID_MIN_SPACING / self.time_scale
+        return _nice_time_step(max(visible_time / 10, min_step))
 
     def _format_time_with_units(self, time_value):
         """Format time value with appropriate units and remove trailing zeros"""
-        # Parse the timescale from waveform_data
-        timescale = self.waveform_data.timescale
-
-        # Extract base unit and multiplier (e.g., "1ns" -> 1, "ns")
-        match = re.match(r"(\d+)\s*(\w+)", timescale)
-        if not match:
-            return str(int(time_value))
-
-        multiplier = int(match.group(1))
-        base_unit = match.group(2)
-
-        # Calculate actual time in base units
-        actual_time = time_value * multiplier
-
-        # Define unit conversions (in ascending order)
-        units = {
-            "fs": 1e-15,
-            "ps": 1e-12,
-            "ns": 1e-9,
-            "us": 1e-6,
-            "ms": 1e-3,
-            "s": 1,
-        }
-
-        # Get the base unit value
-        if base_unit not in units:
-            return str(int(time_value))
-
-        base_value = units[base_unit]
-        time_in_seconds = actual_time * base_value
-
-        # Check if user has selected a specific time base
-        time_base = self.waveform_data.time_base
-
-        if time_base != "auto" and time_base in units:
-            # Use the user-selected time base
-            best_unit = time_base
-            best_value = time_in_seconds / units[time_base]
-        else:
-            # Auto-select the most appropriate unit
-            best_unit = base_unit
-            best_value = actual_time
-
-            for unit, factor in sorted(units.items(), key=lambda x: x[1], reverse=True):
-                converted = time_in_seconds / factor
-                if converted >= 1.0:
-                    best_unit = unit
-                    best_value = converted
-                    break
-
         # Determine precision based on zoom level
         if self.time_scale >= 100:
             precision = 4  # Very zoomed in
@@ -268,47 +718,30 @@ class WaveformCanvas:
         else:
             precision = 0  # Very zoomed out
 
-        # Format the value
-        if best_value == int(best_value) and precision == 0:
-            formatted = f"{int(best_value)}{best_unit}"
-        else:
-            # Format with appropriate precision, then remove trailing zeros
-            formatted = f"{best_value:.{precision}f}".rstrip("0").rstrip(".")
-            formatted = f"{formatted}{best_unit}"
-
-        return formatted
+        return _format_grid_time(
+            time_value,
+            self.waveform_data.get_timescale_parts(),
+            self.waveform_data.time_base,
+            precision,
+        )
 
     def _format_time_precise(self, time_value):
         """Format time value with higher precision for cursor/marker measurements"""
-        # Parse the timescale from waveform_data
-        timescale = self.waveform_data.timescale
-
-        # Extract base unit and multiplier (e.g., "1ns" -> 1, "ns")
-        match = re.match(r"(\d+)\s*(\w+)", timescale)
-        if not match:
+        timescale_parts = self.waveform_data.get_timescale_parts()
+        if timescale_parts is None:
             return str(int(time_value))
 
-        multiplier = int(match.group(1))
-        base_unit = match.group(2)
+        # Base unit and multiplier (e.g., "1ns" -> 1, "ns")
+        multiplier, base_unit = timescale_parts
 
         # Calculate actual time in base units
         actual_time = time_value * multiplier
 
-        # Define unit conversions (in ascending order)
-        units = {
-            "fs": 1e-15,
-            "ps": 1e-12,
-            "ns": 1e-9,
-            "us": 1e-6,
-            "ms": 1e-3,
-            "s": 1,
-        }
-
         # Get the base unit value
-        if base_unit not in units:
+        if base_unit not in _UNIT_FACTORS:
             return str(int(time_value))
 
-        base_value = units[base_unit]
+        base_value = _UNIT_FACTORS[base_unit]
         time_in_seconds = actual_time * base_value
 
         # Always prefer the smallest unit that keeps the value under 10000
@@ -316,9 +749,7 @@ class WaveformCanvas:
         best_unit = base_unit
         best_value = actual_time
 
-        for unit, factor in sorted(
-            units.items(), key=lambda x: x[1]
-        ):  # Sort ascending (smallest first)
+        for unit, factor in _UNITS_ASC:  # Smallest first
             converted = time_in_seconds / factor
             if converted < 10000:  # Use this unit if value is reasonable
                 best_unit = unit
@@ -346,218 +777,278 @@ class WaveformCanvas:
 
         return formatted
 
-    def _draw_signal(self, signal, y_offset):
-        """Draw a single signal waveform"""
+    def _draw_rows(self, rows):
+        """Draw the waveforms of signal rows given as (signal, y_offset, tag)"""
+        # Split the rows by kind once, so each kind is drawn by a loop that
+        # only has to handle that kind
+        digital_rows = []
+        bus_rows = []
+        for row in rows:
+            if not row[0].change_count():
+                continue
+            if row[0].width == 1:
+                digital_rows.append(row)
+            else:
+                bus_rows.append(row)
+
+        if digital_rows:
+            # Binary signals - draw as digital waveforms
+            self._draw_digital_rows(digital_rows)
+        if bus_rows:
+            # Bus signals - draw as multi-bit
+            self._draw_bus_rows(bus_rows)
+
+    def _draw_signal_label(self, signal, y_offset, tag):
+        """Draw the name box of a signal row on the label panel"""
         # Draw signal name background
-        self.canvas.create_rectangle(
+        self.label_canvas.create_rectangle(
             0,
             y_offset - 5,
-            self.left_margin - 5,
+            self.label_width - 5,
             y_offset + self.signal_height - 5,
             fill=self.colors["label_bg"],
             outline=self.colors["grid"],
+            tags=tag,
         )
 
         # Draw signal name
-        self.canvas.create_text(
+        self.label_canvas.create_text(
             10,
             y_offset + self.signal_height // 2,
             text=signal.get_full_name(),
             anchor=tk.W,
             fill=self.colors["text"],
             font=("Courier", 10),
+            tags=tag,
         )
 
-        # Draw waveform
-        if not signal.changes:
-            return
-
-        y_high = y_offset
-        y_low = y_offset + self.signal_height - 10
-        y_mid = y_offset + self.signal_height // 2
-
-        prev_x = self.left_margin
-        prev_value = None
-
-        for timestamp, value in signal.changes:
-            x = self.left_margin + int(timestamp * self.time_scale)
-
-            # Draw transition
-            if prev_value is not None:
-                if signal.width == 1:
-                    # Binary signal - draw as digital waveform
-                    self._draw_digital_transition(
-                        prev_x, x, y_high, y_low, prev_value, value, signal
-                    )
-                else:
-                    # Bus signal - draw as multi-bit
-                    self._draw_bus_transition(
-                        prev_x, x, y_high, y_low, y_mid, prev_value, value, signal
-                    )
-
-            prev_x = x
-            prev_value = value
-
-        # Draw final value to end of canvas
-        if prev_value is not None:
-            end_x = self.left_margin + int(
-                self.waveform_data.max_timestamp * self.time_scale
+    def _visible_changes(self, signal, values, level):
+        """Get (xs, values, at_end) for the changes of a signal worth drawing
+
+        values is a sequence holding one entry per change of the signal; the
+        entries of the changes to draw are returned alongside their canvas
+        x coordinates. at_end tells whether the last change was included.
+        """
+        timestamps, indices = signal.get_decimated(level)
+
+        # Only walk the changes inside the drawn time window, plus the one
+        # before it (value entering the window) and the one after it (end of
+        # the last visible segment)
+        t_lo, t_hi = self._drawn_range
+        start = max(bisect_left(timestamps, t_lo) - 1, 0)
+        stop = min(bisect_right(timestamps, t_hi) + 1, len(timestamps))
+
+        # One comprehension with the scale hoisted into locals keeps the
+        # per-change multiply out of the drawing loops
+        scale = self.time_scale
+        left = self.left_margin
+        xs = [left + int(t * scale) for t in timestamps[start:stop]]
+
+        if indices is None:
+            values = values[start:stop]
+        else:
+            values = [values[i] for i in indices[start:stop]]
+        return xs, values, stop == len(timestamps)
+
+    def _decimation_level(self):
+        """Get the coarsest decimation level whose buckets fit in one pixel"""
+        # Changes less than a pixel apart are folded into activity blocks
+        # anyway, so only the first and last change of each such bucket matter
+        return max(0, floor(log2(1 / self.time_scale)))
+
+    def _draw_digital_rows(self, rows):
+        """Draw digital signal rows as one polyline per run of equal color"""
+        # The final value of a signal is drawn to the end of the canvas
+        end_x = self._time_to_x(self.waveform_data.max_timestamp)
+        low_offset = self.signal_height - 10
+        level = self._decimation_level()
+
+        # Look everything up once, not per row or per run
+        create_line = self.canvas.create_line
+        create_rectangle = self.canvas.create_rectangle
+        color_x, color_z = self._special_colors
+
+        for signal, y_offset, tag in rows:
+            y_high = y_offset
+            y_low = y_offset + low_offset
+
+            xs, codes, at_end = self._visible_changes(signal, signal.get_codes(), level)
+            runs, bursts = build_digital_runs(
+                xs, codes, y_high, y_low, end_x if at_end else None
             )
-            if signal.width == 1:
-                self._draw_digital_value(
-                    prev_x, end_x, y_high, y_low, prev_value, signal
-                )
-            else:
-                self._draw_bus_value(
-                    prev_x, end_x, y_high, y_low, y_mid, prev_value, signal
-                )
-
-    def _draw_digital_transition(self, x1, x2, y_high, y_low, old_val, new_val, signal):
-        """Draw digital signal transition"""
-        color = self._get_signal_color(old_val, signal)
-
-        # Horizontal line at old value level
-        y_old = y_low if old_val in ["0", "l", "L"] else y_high
-        self.canvas.create_line(x1, y_old, x2, y_old, fill=color, width=2)
-
-        # Vertical transition line
-        y_new = y_low if new_val in ["0", "l", "L"] else y_high
-        self.canvas.create_line(x2, y_old, x2, y_new, fill=color, width=2)
-
-    def _draw_digital_value(self, x1, x2, y_high, y_low, value, signal):
-        """Draw digital signal value"""
-        color = self._get_signal_color(value, signal)
-        y = y_low if value in ["0", "l", "L"] else y_high
-        self.canvas.create_line(x1, y, x2, y, fill=color, width=2)
-
-    def _draw_bus_transition(
-        self, x1, x2, y_high, y_low, y_mid, old_val, new_val, signal
-    ):
-        """Draw bus signal transition"""
-        color = signal.color  # Use signal's custom color for buses
 
-        # Draw old value
-        self.canvas.create_line(x1, y_high, x2 - 5, y_high, fill=color, width=2)
-        self.canvas.create_line(x1, y_low, x2 - 5, y_low, fill=color, width=2)
-
-        # Draw transition (X shape)
-        self.canvas.create_line(x2 - 5, y_high, x2 + 5, y_low, fill=color, width=2)
-        self.canvas.create_line(x2 - 5, y_low, x2 + 5, y_high, fill=color, width=2)
+            # For special values (x, z), use default colors, otherwise use the
+            # signal's custom color
+            color = signal.color
+            colors = (color, color, color_x, color_z)  # Indexed by value code
+            for code, points in runs:
+                create_line(*points, fill=colors[code], width=2, tags=tag)
+            for x1, x2 in bursts:
+                create_rectangle(
+                    x1, y_high, x2, y_low, fill=color, outline=color, tags=tag
+                )
 
-        # Draw value label
-        if x2 - x1 > 40:
-            self.canvas.create_text(
-                (x1 + x2) // 2,
-                y_mid,
-                text=self._format_bus_value(old_val),
-                fill=self.colors["text"],
-                font=("Courier", 8),
+    def _draw_bus_rows(self, rows):
+        """Draw bus signal rows as two crossing rail polylines each"""
+        # The final value of a signal is drawn to the end of the canvas
+        end_x = self._time_to_x(self.waveform_data.max_timestamp)
+        low_offset = self.signal_height - 10
+        mid_offset = self.signal_height // 2
+        level = self._decimation_level()
+
+        # The segments at either end of the window may reach far outside it,
+        # so their labels can be centred where nothing is drawn
+        x_lo, x_hi = self._drawn_x_range()
+
+        # Look everything up once, not per row or per label
+        create_line = self.canvas.create_line
+        create_rectangle = self.canvas.create_rectangle
+        create_text = self.canvas.create_text
+        text_color = self.colors["text"]
+
+        for signal, y_offset, tag in rows:
+            y_high = y_offset
+            y_low = y_offset + low_offset
+            y_mid = y_offset + mid_offset
+            color = signal.color  # Use signal's custom color for buses
+
+            xs, values, at_end = self._visible_changes(
+                signal, signal.get_display_values(), level
             )
-
-    def _draw_bus_value(self, x1, x2, y_high, y_low, y_mid, value, signal):
-        """Draw bus signal value"""
-        color = signal.color  # Use signal's custom color for buses
-
-        self.canvas.create_line(x1, y_high, x2, y_high, fill=color, width=2)
-        self.canvas.create_line(x1, y_low, x2, y_low, fill=color, width=2)
-
-        if x2 - x1 > 40:
-            self.canvas.create_text(
-                (x1 + x2) // 2,
-                y_mid,
-                text=self._format_bus_value(value),
-                fill=self.colors["text"],
-                font=("Courier", 8),
+            rails, labels, bursts = build_bus_rails(
+                xs, values, y_high, y_low, end_x if at_end else None
             )
 
-    def _get_signal_color(self, value, signal):
-        """Get color for signal value"""
-        # For special values (x, z), use default colors
-        if value in ["x", "X"]:
-            return self.colors["signal_x"]
-        elif value in ["z", "Z"]:
-            return self.colors["signal_z"]
-
-        # Otherwise use the signal's custom color
-        return signal.color
-
-    def _format_bus_value(self, value):
-        """Format bus value for display"""
-        if not value or value in ["x", "X", "z", "Z"]:
-            return value.upper()
-
-        # Convert binary to hex if long enough
-        if len(value) > 4:
-            try:
-                hex_val = hex(int(value, 2))[2:].upper()
-                return f"0x{hex_val}"
-            except ValueError:
-                return value
-
-        return value
+            for upper, lower in rails:
+                create_line(*upper, fill=color, width=2, tags=tag)
+                create_line(*lower, fill=color, width=2, tags=tag)
+            for x1, x2, text in labels:
+                # Value label centred on the segment
+                x = (x1 + x2) // 2
+                if x_lo <= x <= x_hi:
+                    create_text(
+                        x,
+                        y_mid,
+                        text=text,
+                        fill=text_color,
+                        font=("Courier", 8),
+                        tags=tag,
+                    )
+            for x1, x2 in bursts:
+                # Block standing in for transitions too dense to resolve
+                create_rectangle(
+                    x1, y_high, x2, y_low, fill=color, outline=color, tags=tag
+                )
 
     def _draw_markers(self, height):
-        """Draw time markers"""
-        for marker in self.waveform_data.markers:
+        """Draw time markers, moving the items of markers already drawn"""
+        t_lo, t_hi = self._drawn_range
+        marker_items = {}
+        created = False
+        for marker in self.waveform_data.get_markers_in_range(t_lo, t_hi):
             x = self.left_margin + int(marker.timestamp * self.time_scale)
 
             # Marker color - brighter if selected
             color = marker.color
             width = 3 if marker.selected else 2
 
-            self.canvas.create_line(
-                x, 0, x, height, fill=color, width=width, tags="marker"
-            )
-
-            if marker.label:
-                self.canvas.create_text(
-                    x + 5,
-                    10,
-                    text=marker.label,
-                    anchor=tk.W,
-                    fill=color,
-                    font=("Courier", 10, "bold"),
-                    tags="marker",
-                )
-
             # Show timestamp
             time_label = self._format_time_precise(marker.timestamp)
-            self.canvas.create_text(
-                x - 5,
-                height - 10,
-                text=time_label,
-                anchor=tk.E,
-                fill=color,
-                font=("Courier", 9, "bold"),
-                tags="marker",
-            )
+
+            items = self._marker_items.pop(marker, None)
+            if items is None:
+                items = (
+                    self.canvas.create_line(
+                        x, 0, x, height, fill=color, width=width, tags="marker"
+                    ),
+                    self.canvas.create_text(
+                        x + 5,
+                        10,
+                        text=marker.label,
+                        anchor=tk.W,
+                        fill=color,
+                        font=("Courier", 10, "bold"),
+                        tags="marker",
+                    ),
+                    self.canvas.create_text(
+                        x - 5,
+                        height - 10,
+                        text=time_label,
+                        anchor=tk.E,
+                        fill=color,
+                        font=("Courier", 9, "bold"),
+                        tags="marker",
+                    ),
+                )
+                created = True
+            else:
+                # Updating existing items is much cheaper than recreating them
+                line, label, time_text = items
+                self.canvas.coords(line, x, 0, x, height)
+                self.canvas.itemconfigure(line, fill=color, width=width)
+                self.canvas.coords(label, x + 5, 10)
+                self.canvas.itemconfigure(label, text=marker.label, fill=color)
+                self.canvas.coords(time_text, x - 5, height - 10)
+                self.canvas.itemconfigure(time_text, text=time_label, fill=color)
+            marker_items[marker] = items
+
+        # Drop markers that were removed or left the drawn time window
+        for items in self._marker_items.values():
+            self.canvas.delete(*items)
+        self._marker_items = marker_items
+
+        if created:
+            # New markers must not cover the cursor
+            self.canvas.tag_raise("cursor")
+
+    def _draw_marker_selection(self, marker):
+        """Show a marker's selection state without redrawing the overlay"""
+        # Selection only changes the line width and the cursor's delta label
+        items = self._marker_items.get(marker)
+        if items is not None:
+            self.canvas.itemconfigure(items[0], width=3 if marker.selected else 2)
+        self._draw_cursor(self._canvas_height)
 
     def _draw_cursor(self, height):
-        """Draw the time cursor"""
+        """Draw the time cursor, moving its items if they already exist"""
         if not self.waveform_data.cursor or not self.waveform_data.cursor.visible:
+            self.canvas.delete("cursor")
+            self._cursor_items = None
             return
 
+        if self._cursor_items is None:
+            # Items are created once and then only moved and relabelled,
+            # which keeps dragging the cursor cheap
+            self._cursor_items = (
+                self.canvas.create_line(
+                    0, 0, 0, 0, fill="yellow", width=2, dash=(4, 2), tags="cursor"
+                ),
+                self.canvas.create_rectangle(
+                    0, 0, 0, 0, fill="#444444", outline="yellow", tags="cursor"
+                ),
+                self.canvas.create_text(
+                    0, 0, fill="yellow", font=("Courier", 9, "bold"), tags="cursor"
+                ),
+                self.canvas.create_rectangle(
+                    0, 0, 0, 0, fill="#444444", outline="yellow", tags="cursor"
+                ),
+                self.canvas.create_text(
+                    0, 0, fill="#ffff00", font=("Courier", 8), tags="cursor"
+                ),
+            )
+        line, label_box, label, delta_box, delta_text = self._cursor_items
+
         cursor = self.waveform_data.cursor
         x = self.left_margin + int(cursor.timestamp * self.time_scale)
 
-        # Draw cursor line
-        self.canvas.create_line(
-            x, 0, x, height, fill="yellow", width=2, dash=(4, 2), tags="cursor"
-        )
+        # Cursor line
+        self.canvas.coords(line, x, 0, x, height)
 
-        # Draw cursor time label
+        # Cursor time label
         time_label = self._format_time_precise(cursor.timestamp)
-        self.canvas.create_rectangle(
-            x - 40, 35, x + 40, 50, fill="#444444", outline="yellow", tags="cursor"
-        )
-        self.canvas.create_text(
-            x,
-            42,
-            text=time_label,
-            fill="yellow",
-            font=("Courier", 9, "bold"),
-            tags="cursor",
-        )
+        self.canvas.coords(label_box, x - 40, 35, x + 40, 50)
+        self.canvas.coords(label, x, 42)
+        self.canvas.itemconfigure(label, text=time_label)
 
         # Show delta if markers are selected
         selected_markers = self.waveform_data.get_selected_markers()
@@ -566,22 +1057,20 @@ class WaveformCanvas:
             delta = abs(cursor.timestamp - marker_time)
             delta_label = f"Δ {self._format_time_precise(delta)}"
 
-            self.canvas.create_rectangle(
-                x - 50, 55, x + 50, 70, fill="#444444", outline="yellow", tags="cursor"
-            )
-            self.canvas.create_text(
-                x,
-                62,
-                text=delta_label,
-                fill="#ffff00",
-                font=("Courier", 8),
-                tags="cursor",
-            )
+            self.canvas.coords(delta_box, x - 50, 55, x + 50, 70)
+            self.canvas.coords(delta_text, x, 62)
+            self.canvas.itemconfigure(delta_box, state=tk.NORMAL)
+            self.canvas.itemconfigure(delta_text, text=delta_label, state=tk.NORMAL)
+        else:
+            self.canvas.itemconfigure(delta_box, state=tk.HIDDEN)
+            self.canvas.itemconfigure(delta_text, state=tk.HIDDEN)
 
     def set_time_scale(self, scale):
         """Set the time scale (zoom)"""
+        if scale == self.time_scale:
+            return
         self.time_scale = scale
-        self.draw_waveforms()
+        self.request_redraw()
 
     def _on_mouse_down(self, event):
         """Handle mouse button press for panning or dragging"""
@@ -600,7 +1089,10 @@ class WaveformCanvas:
                 return
 
         # Check if clicking near a marker (within 10 pixels)
-        for marker in self.waveform_data.markers:
+        nearby = self.waveform_data.get_markers_in_range(
+            self._x_to_time(canvas_x - 10), self._x_to_time(canvas_x + 10)
+        )
+        for marker in nearby:
             marker_x = self._time_to_x(marker.timestamp)
             if abs(canvas_x - marker_x) < 10:
                 self.dragged_object = "marker"
@@ -609,7 +1101,7 @@ class WaveformCanvas:
                 # Toggle selection
                 marker.selected = not marker.selected
                 self.canvas.config(cursor="sb_h_double_arrow")
-                self.draw_waveforms()
+                self._draw_marker_selection(marker)
                 return
 
         # Otherwise, start panning
@@ -619,35 +1111,36 @@ class WaveformCanvas:
         self.drag_start_y = event.y
         self.is_dragging = True
 
+        # The canvas isn't resized during a drag, so measure it only once
+        self._drag_canvas_size = (
+            self.canvas.winfo_width(),
+            self.canvas.winfo_height(),
+        )
+
     def _on_mouse_drag(self, event):
         """Handle mouse drag for panning or dragging cursor/markers"""
-        canvas_x = self.canvas.canvasx(event.x)
-
-        # Dragging cursor
-        if self.dragged_object == "cursor":
-            time = self._x_to_time(canvas_x)
-            time = max(0, min(self.waveform_data.max_timestamp, time))
-
-            # Snap to edges unless Alt is pressed
-            if not self.alt_pressed:
-                time = self._snap_to_edge(time)
+        dragged_object = self.dragged_object
 
-            self.waveform_data.cursor.timestamp = time
-            self.draw_waveforms()
-            return
-
-        # Dragging marker
-        if self.dragged_object == "marker" and self.dragged_marker:
-            time = self._x_to_time(canvas_x)
-            time = max(0, min(self.waveform_data.max_timestamp, time))
+        # Dragging cursor or marker
+        if dragged_object == "cursor" or (
+            dragged_object == "marker" and self.dragged_marker
+        ):
+            waveform_data = self.waveform_data
+            time = self._x_to_time(self.canvas.canvasx(event.x))
+            time = max(0, min(waveform_data.max_timestamp, time))
 
             # Snap to edges unless Alt is pressed
             if not self.alt_pressed:
                 time = self._snap_to_edge(time)
 
-            self.dragged_marker.timestamp = time
-            self.waveform_data.markers.sort(key=lambda m: m.timestamp)
-            self.draw_waveforms()
+            if dragged_object == "cursor":
+                waveform_data.cursor.timestamp = time
+                # Only the cursor moved - leave the waveforms alone
+                self.request_overlay(markers=False)
+            else:
+                waveform_data.move_marker(self.dragged_marker, time)
+                # Only the overlay changed - leave the waveforms alone
+                self.request_overlay()
             return
 
         # Panning
@@ -668,30 +1161,29 @@ class WaveformCanvas:
             y_view = self.canvas.yview()
 
             # Calculate scroll amounts (inverted for natural dragging)
-            scroll_region = self.canvas.cget("scrollregion")
-            if scroll_region:
-                scroll_coords = [float(x) for x in scroll_region.split()]
-                if len(scroll_coords) == 4:
-                    total_width = scroll_coords[2] - scroll_coords[0]
-                    total_height = scroll_coords[3] - scroll_coords[1]
-                    canvas_width = self.canvas.winfo_width()
-                    canvas_height = self.canvas.winfo_height()
-
-                    # Only scroll if content is larger than viewport
-                    if total_width > canvas_width and canvas_width > 0:
-                        x_scroll = -dx / total_width
-                        new_x = max(0.0, min(1.0, x_view[0] + x_scroll))
-                        self.canvas.xview_moveto(new_x)
-
-                    if total_height > canvas_height and canvas_height > 0:
-                        y_scroll = -dy / total_height
-                        new_y = max(0.0, min(1.0, y_view[0] + y_scroll))
-                        self.canvas.yview_moveto(new_y)
+            if self._scroll_region:
+                x1, y1, x2, y2 = self._scroll_region
+                total_width = x2 - x1
+                total_height = y2 - y1
+                canvas_width, canvas_height = self._drag_canvas_size
+
+                # Only scroll if content is larger than viewport
+                if total_width > canvas_width and canvas_width > 0:
+                    x_scroll = -dx / total_width
+                    new_x = max(0.0, min(1.0, x_view[0] + x_scroll))
+                    self.canvas.xview_moveto(new_x)
+
+                if total_height > canvas_height and canvas_height > 0:
+                    y_scroll = -dy / total_height
+                    new_y = max(0.0, min(1.0, y_view[0] + y_scroll))
+                    self.canvas.yview_moveto(new_y)
 
             # Update start position for next drag event
             self.drag_start_x = event.x
             self.drag_start_y = event.y
 
+            self._on_viewport_change()
+
     def _on_mouse_up(self, event):
         """Handle mouse button release"""
         self.canvas.config(cursor="")  # Reset cursor
@@ -718,12 +1210,10 @@ class WaveformCanvas:
         if not self.alt_pressed:
             time = self._snap_to_edge(time)
 
-        # Add marker
-        from models import Marker
-
+        # Add marker - only the overlay changes
         marker = Marker(time, f"M{len(self.waveform_data.markers) + 1}", "cyan")
         self.waveform_data.add_marker(marker)
-        self.draw_waveforms()
+        self.request_overlay()
 
     def _on_alt_press(self, event):
         """Handle Alt key press"""
@@ -737,6 +1227,11 @@ class WaveformCanvas:
         """Convert time value to canvas x coordinate"""
         return self.left_margin + int(time * self.time_scale)
 
+    def _drawn_x_range(self):
+        """Get the canvas x span of the time window covered by drawn items"""
+        t_lo, t_hi = self._drawn_range
+        return self._time_to_x(t_lo), self._time_to_x(t_hi)
+
     def _x_to_time(self, x):
         """Convert canvas x coordinate to time value"""
         return (x - self.left_margin) / self.time_scale
@@ -751,8 +1246,15 @@ class WaveformCanvas:
         if not edges:
             return time
 
-        # Find closest edge
-        closest_edge = min(edges, key=lambda e: abs(e - time))
+        # Find closest edge - edges are sorted, so it is one of the two
+        # around the insertion point of time
+        i = bisect_left(edges, time)
+        if i == len(edges):
+            closest_edge = edges[-1]
+        elif i == 0 or edges[i] - time < time - edges[i - 1]:
+            closest_edge = edges[i]
+        else:
+            closest_edge = edges[i - 1]
 
         # Snap if within threshold
         if abs(closest_edge - time) <= threshold:
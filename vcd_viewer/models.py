@@ -3,6 +3,66 @@ VCD Waveform Viewer - Data Models
 Defines the data structures for signals, markers, and waveform data
 """
 
+import re
+from array import array
+from bisect import bisect_right
+
+# Codes of single-bit values, stored alongside the value strings so drawing
+# can compare small integers instead of strings
+VALUE_LOW = 0
+VALUE_HIGH = 1
+VALUE_X = 2
+VALUE_Z = 3
+
+VALUE_CODES = {
+    "0": VALUE_LOW,
+    "l": VALUE_LOW,
+    "L": VALUE_LOW,
+    "1": VALUE_HIGH,
+    "h": VALUE_HIGH,
+    "H": VALUE_HIGH,
+    "x": VALUE_X,
+    "X": VALUE_X,
+    "z": VALUE_Z,
+    "Z": VALUE_Z,
+}
+
+
+# Multiplier and unit of a timescale (e.g., "1ns" -> 1, "ns")
+_TIMESCALE_PARTS_RE = re.compile(r"(\d+)\s*(\w+)")
+
+# Single-character values shown as they are (upper-cased) rather than as hex
+_UNKNOWN_VALUES = frozenset("xXzZ")
+
+
+def _format_bus_value(value):
+    """Format bus value for display"""
+    if not value or value in _UNKNOWN_VALUES:
+        return value.upper()
+
+    # Convert binary to hex if long enough
+    if len(value) > 4:
+        try:
+            hex_val = hex(int(value, 2))[2:].upper()
+            return f"0x{hex_val}"
+        except ValueError:
+            return value
+
+    return value
+
+
+def _bisect_markers(markers, timestamp, right=False):
+    """Binary search a timestamp-sorted marker list like bisect_left/right"""
+    lo, hi = 0, len(markers)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        marker_time = markers[mid].timestamp
+        if marker_time < timestamp or (right and marker_time == timestamp):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
 
 class Signal:
     """Represents a signal in the VCD file"""
@@ -12,36 +72,103 @@ class Signal:
         self.name = name  # Full signal name
         self.width = width  # Bit width
         self.scope = scope  # Hierarchical scope
-        self.changes = []  # List of (timestamp, value) tuples
+        self.full_name = f"{scope}.{name}" if scope else name  # Qualified name
+        # Changes are kept as parallel arrays rather than a list of tuples,
+        # which needs far less memory on large dumps
+        self._timestamps = array("q")  # Timestamps of changes
+        self._values = []  # Values of changes
+        self._codes = bytearray()  # Value codes of changes (single-bit only)
+        self._display_values = None  # Formatted values, built on first use
+        self._decimated = None  # (level, decimated changes) of the last level used
         self.visible = True  # Display flag
         self.color = "#00ff00"  # Default signal color (green)
 
     def add_change(self, timestamp, value):
         """Add a value change at given timestamp"""
-        self.changes.append((timestamp, value))
+        self._timestamps.append(timestamp)
+        self._values.append(value)
+        if self.width == 1:
+            # Anything unrecognised is drawn like a high level
+            self._codes.append(VALUE_CODES.get(value, VALUE_HIGH))
+        self._display_values = None
+        self._decimated = None
+
+    @property
+    def changes(self):
+        """List of (timestamp, value) tuples"""
+        return list(zip(self._timestamps, self._values))
 
     def get_value_at(self, timestamp):
         """Get signal value at specific timestamp"""
-        if not self.changes:
-            return None
-
         # Find the most recent change before or at timestamp
-        value = None
-        for ts, val in self.changes:
-            if ts > timestamp:
-                break
-            value = val
-        return value
+        i = bisect_right(self._timestamps, timestamp)
+        if i == 0:
+            return None
+        return self._values[i - 1]
+
+    def get_display_values(self):
+        """Get the display strings of all change values, in change order"""
+        # Values never change once added, so each is formatted only once
+        # rather than on every redraw. Buses tend to cycle through a few
+        # values, so each distinct value is formatted once and shared
+        if self._display_values is None:
+            formatted = {v: _format_bus_value(v) for v in set(self._values)}
+            self._display_values = [formatted[v] for v in self._values]
+        return self._display_values
+
+    def get_decimated(self, level):
+        """Get the changes kept at a decimation level as (timestamps, indices)
+
+        Level k splits time into buckets 2**k units wide and keeps only the
+        first and last change of each bucket; indices are the positions of
+        the kept changes in the full change list. Level 0 keeps every change
+        and returns None for indices.
+        """
+        if level == 0:
+            return self._timestamps, None
+
+        # Only the last level is kept: each can be as large as the changes
+        # themselves, and redraws at one zoom keep asking for the same level
+        if self._decimated is not None and self._decimated[0] == level:
+            return self._decimated[1]
+
+        timestamps = array("q")
+        indices = array("q")
+        last_bucket = None
+        full = False  # Whether the last bucket already has two changes
+        for i, timestamp in enumerate(self._timestamps):
+            bucket = timestamp >> level
+            if bucket == last_bucket and full:
+                # Later change in a full bucket - it becomes the last one
+                timestamps[-1] = timestamp
+                indices[-1] = i
+            else:
+                full = bucket == last_bucket
+                last_bucket = bucket
+                timestamps.append(timestamp)
+                indices.append(i)
+        self._decimated = (level, (timestamps, indices))
+        return timestamps, indices
+
+    def get_codes(self):
+        """Get the value codes of all changes, in change order (do not modify)
+
+        Only single-bit signals have codes; the bytearray is empty otherwise.
+        """
+        return self._codes
 
     def get_full_name(self):
         """Get fully qualified signal name"""
-        if self.scope:
-            return f"{self.scope}.{self.name}"
-        return self.name
+        return self.full_name
+
+    def change_count(self):
+        """Get the number of value changes"""
+        return len(self._timestamps)
 
     def get_edges(self):
-        """Get list of all edge timestamps"""
-        return [ts for ts, _ in self.changes]
+        """Get the sorted array of all edge timestamps (do not modify)"""
+        # Timestamps are already stored as a sorted array, so no copy is made
+        return self._timestamps
 
 
 class Marker:
@@ -69,7 +196,9 @@ class WaveformData:
 
     def __init__(self):
         self.timescale = "1ns"  # Time unit
+        self._timescale_parts = (None, None)  # (timescale, its parsed parts)
         self.signals = {}  # Dict: identifier -> Signal
+        self._by_full_name = {}  # Dict: full name -> Signal
         self.markers = []  # List of Markers
         self.max_timestamp = 0  # Maximum time value
         self.scope_hierarchy = {}  # Hierarchical organization
@@ -78,16 +207,52 @@ class WaveformData:
             "auto"  # Display time base: "auto", "fs", "ps", "ns", "us", "ms", "s"
         )
         self.display_order = []  # List of signal names in display order
+        self._sorted_signals = None  # Cached result of get_all_signals
+        self._ordered_signals = (None, None)  # (display_order copy, signals)
+        self.dirty_signals = set()  # Identifiers of signals needing a redraw
+        self._edges = []  # Sorted edges of the visible signals
+        self._edges_key = None  # Visible signals and change counts of _edges
+
+    def get_timescale_parts(self):
+        """Get the timescale as (multiplier, unit), or None if unparseable"""
+        # Parsed once and reused until the timescale string changes
+        if self._timescale_parts[0] != self.timescale:
+            # Extract base unit and multiplier (e.g., "1ns" -> 1, "ns")
+            match = _TIMESCALE_PARTS_RE.match(self.timescale)
+            parts = (int(match.group(1)), match.group(2)) if match else None
+            self._timescale_parts = (self.timescale, parts)
+        return self._timescale_parts[1]
 
     def add_signal(self, signal):
         """Add a signal to the data model"""
+        # A signal replacing one with the same identifier takes over its name
+        old = self.signals.get(signal.identifier)
+        if old is not None and self._by_full_name.get(old.full_name) is old:
+            del self._by_full_name[old.full_name]
+
         self.signals[signal.identifier] = signal
+        self._by_full_name[signal.full_name] = signal
+        self._sorted_signals = None
+        self._ordered_signals = (None, None)
 
         # Update scope hierarchy
         if signal.scope:
-            if signal.scope not in self.scope_hierarchy:
-                self.scope_hierarchy[signal.scope] = []
-            self.scope_hierarchy[signal.scope].append(signal)
+            self.scope_hierarchy.setdefault(signal.scope, []).append(signal)
+
+    def reset_view(self):
+        """Restore the display state of a freshly parsed file"""
+        for signal in self.signals.values():
+            signal.visible = True
+            signal.color = "#00ff00"
+        self.markers = []
+        self.cursor = Cursor(0)
+        self.time_base = "auto"
+        self.display_order = []
+        self.dirty_signals.clear()
+
+    def mark_dirty(self, signal):
+        """Flag a signal whose appearance changed so only it gets redrawn"""
+        self.dirty_signals.add(signal.identifier)
 
     def get_signal_by_identifier(self, identifier):
         """Retrieve signal by its VCD identifier"""
@@ -95,22 +260,30 @@ class WaveformData:
 
     def get_signal_by_name(self, full_name):
         """Retrieve signal by its full name"""
-        for signal in self.signals.values():
-            if signal.get_full_name() == full_name:
-                return signal
-        return None
+        return self._by_full_name.get(full_name)
 
     def get_all_signals(self):
-        """Get list of all signals sorted by scope and name"""
-        return sorted(self.signals.values(), key=lambda s: (s.scope, s.name))
+        """Get list of all signals sorted by scope and name (do not modify)"""
+        # Signals are only ever added, so the sort is redone only after that
+        if self._sorted_signals is None:
+            self._sorted_signals = sorted(
+                self.signals.values(), key=lambda s: (s.scope, s.name)
+            )
+        return self._sorted_signals
 
     def get_signals_in_display_order(self):
-        """Get signals in the user-specified display order"""
+        """Get signals in the user-specified display order (do not modify)"""
         if not self.display_order:
             return self.get_all_signals()
 
-        # Build a dict for quick lookup
-        signal_dict = {s.get_full_name(): s for s in self.signals.values()}
+        # display_order is edited in place by the viewer, so the cached order
+        # is checked against a copy of it rather than the list object
+        order, ordered_signals = self._ordered_signals
+        if order == self.display_order:
+            return ordered_signals
+
+        # Look names up in the index kept up to date by add_signal
+        signal_dict = self._by_full_name
 
         # Return signals in display order
         ordered_signals = []
@@ -121,20 +294,63 @@ class WaveformData:
         # Add any signals not in display_order at the end
         ordered_names = set(self.display_order)
         for signal in self.get_all_signals():
-            if signal.get_full_name() not in ordered_names:
+            if signal.full_name not in ordered_names:
                 ordered_signals.append(signal)
 
+        self._ordered_signals = (list(self.display_order), ordered_signals)
         return ordered_signals
 
     def add_marker(self, marker):
         """Add a time marker"""
-        self.markers.append(marker)
-        self.markers.sort(key=lambda m: m.timestamp)
+        # Insert after markers at the same time, like a stable sort would
+        i = _bisect_markers(self.markers, marker.timestamp, right=True)
+        self.markers.insert(i, marker)
+
+    def move_marker(self, marker, timestamp):
+        """Move a marker to a new time, keeping the markers sorted"""
+        # Find the marker's slot among the markers at its old time, like
+        # remove_marker, rather than scanning the whole list
+        markers = self.markers
+        i = _bisect_markers(markers, marker.timestamp)
+        hi = _bisect_markers(markers, marker.timestamp, right=True)
+        while i < hi and markers[i] is not marker:
+            i += 1
+        marker.timestamp = timestamp
+        if i == hi:
+            return
+
+        # A dragged marker rarely passes its neighbors, so walking it to its
+        # new place is much cheaper than sorting the whole list again
+        while i > 0 and markers[i - 1].timestamp > timestamp:
+            markers[i] = markers[i - 1]
+            i -= 1
+        while i + 1 < len(markers) and markers[i + 1].timestamp < timestamp:
+            markers[i] = markers[i + 1]
+            i += 1
+        markers[i] = marker
 
     def remove_marker(self, marker):
         """Remove a time marker"""
-        if marker in self.markers:
-            self.markers.remove(marker)
+        # Only markers at the marker's time need to be searched
+        markers = self.markers
+        lo = _bisect_markers(markers, marker.timestamp)
+        hi = _bisect_markers(markers, marker.timestamp, right=True)
+        for i in range(lo, hi):
+            if markers[i] is marker:
+                del markers[i]
+                return
+
+    def remove_markers(self, markers):
+        """Remove several time markers at once"""
+        # One pass over the list rather than one deletion (and shift) each
+        removed = set(markers)
+        self.markers[:] = [m for m in self.markers if m not in removed]
+
+    def get_markers_in_range(self, start, end):
+        """Get markers with start <= timestamp <= end (markers are kept sorted)"""
+        lo = _bisect_markers(self.markers, start)
+        hi = _bisect_markers(self.markers, end, right=True)
+        return self.markers[lo:hi]
 
     def get_selected_markers(self):
         """Get list of selected markers"""
@@ -146,9 +362,19 @@ class WaveformData:
             self.max_timestamp = timestamp
 
     def get_all_edges(self):
-        """Get all edge timestamps from visible signals"""
-        edges = set()
-        for signal in self.get_all_signals():
-            if signal.visible:
-                edges.update(signal.get_edges())
-        return sorted(edges)
+        """Get all edge timestamps from visible signals, sorted (do not modify)"""
+        # The merged list is only rebuilt when the visible signals or their
+        # number of changes differ from the last call
+        key = tuple(
+            (s.identifier, s.change_count())
+            for s in self.signals.values()
+            if s.visible
+        )
+        if key != self._edges_key:
+            edges = set()
+            for signal in self.signals.values():
+                if signal.visible:
+                    edges.update(signal.get_edges())
+            self._edges = sorted(edges)
+            self._edges_key = key
+        return self._edges
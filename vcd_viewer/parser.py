@@ -3,13 +3,54 @@ VCD Waveform Viewer - VCD File Parser
 Parses standard VCD format files and populates WaveformData
 """
 
+import mmap
+import os
 import re
 from models import Signal, WaveformData
 
+# Timescale value such as "1ns" or "10 ps"
+_TIMESCALE_RE = re.compile(r"(\d+\s*\w+)")
+
+# Kinds of lines in the value change section, told apart by their first byte
+_LINE_OTHER = 0
+_LINE_SCALAR = 1
+_LINE_TIMESTAMP = 2
+_LINE_VECTOR = 3
+_LINE_COMMAND = 4
+
+
+def _build_line_kinds():
+    """Build the table mapping each possible first byte to its line kind"""
+    kinds = bytearray(256)
+    for chars, kind in (
+        (b"01xzXZ", _LINE_SCALAR),
+        (b"#", _LINE_TIMESTAMP),
+        (b"bBrR", _LINE_VECTOR),
+        (b"$", _LINE_COMMAND),
+    ):
+        for char in chars:
+            kinds[char] = kind
+    return bytes(kinds)
+
+
+_LINE_KINDS = _build_line_kinds()
+
+# Value strings of scalar changes, by their byte
+_SCALAR_VALUES = {ord(char): char for char in "01xzXZ"}
+
 
 class VCDParser:
     """Parser for Value Change Dump (VCD) files"""
 
+    # Handlers of $ commands by keyword; other commands are skipped
+    _COMMAND_HANDLERS = {
+        "$timescale": "_parse_timescale",
+        "$scope": "_parse_scope",
+        "$upscope": "_parse_upscope",
+        "$var": "_parse_var",
+        "$enddefinitions": "_parse_enddefinitions",
+    }
+
     def __init__(self):
         self.data = WaveformData()
         self.current_scope = []
@@ -21,88 +62,153 @@ class VCDParser:
         self.current_scope = []
         self.current_timestamp = 0
 
-        with open(filename, "r") as f:
-            lines = f.readlines()
+        # The file is mapped and read a line at a time rather than loaded as
+        # a list of strings, so large dumps aren't held in memory twice
+        with open(filename, "rb") as f:
+            # An empty file can't be mapped, and has nothing to parse anyway
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    # The file is read front to back exactly once, so let the
+                    # OS read ahead aggressively where it supports the hint
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        buf.madvise(mmap.MADV_SEQUENTIAL)
+                    self._parse_lines(buf)
 
-        self._parse_lines(lines)
         return self.data
 
-    def _parse_lines(self, lines):
-        """Parse all lines from VCD file"""
-        in_header = True
-        i = 0
-
-        while i < len(lines):
-            line = lines[i].strip()
+    def _parse_lines(self, buf):
+        """Parse all lines from a VCD file buffer"""
+        for line in iter(buf.readline, b""):
+            line = line.strip()
 
             if not line:
-                i += 1
                 continue
 
             # Header sections
-            if line.startswith("$"):
-                if line.startswith("$timescale"):
-                    i = self._parse_timescale(lines, i)
-                elif line.startswith("$scope"):
-                    i = self._parse_scope(lines, i)
-                elif line.startswith("$upscope"):
-                    self._pop_scope()
-                    i += 1
-                elif line.startswith("$var"):
-                    i = self._parse_var(lines, i)
-                elif line.startswith("$enddefinitions"):
-                    in_header = False
-                    i += 1
-                else:
-                    # Skip other header commands
-                    i = self._skip_to_end(lines, i)
+            if line.startswith(b"$"):
+                if line.startswith(b"$enddefinitions"):
+                    # Everything after the definitions is value changes
+                    self._parse_value_changes(buf)
+                    return
+                self._parse_command(line.decode(), buf)
 
             # Value change sections
-            elif line.startswith("#"):
-                i = self._parse_timestamp(lines, i)
+            elif line.startswith(b"#"):
+                self._parse_timestamp(line.decode())
+
+    def _parse_command(self, line, buf):
+        """Parse a $ command, reading any further lines it spans from buf"""
+        keyword = line.split(None, 1)[0]
+        handler = self._COMMAND_HANDLERS.get(keyword, "_skip_to_end")
+        getattr(self, handler)(line, buf)
+
+    def _parse_value_changes(self, buf):
+        """Parse the value change section, up to the end of buf"""
+        # This loop runs once per value change, which is nearly every line of
+        # a large dump, so it handles the common lines inline and looks up
+        # everything it needs only once. Lines stay bytes and are classified
+        # by a table lookup on their first byte
+        signals = self._signals_by_identifier()
+        timestamp = self.current_timestamp
+        max_timestamp = self.data.max_timestamp
+
+        # Buses tend to cycle through a few values, so each distinct value is
+        # decoded once and its string shared by all changes to that value
+        shared_values = {}
+
+        for line in iter(buf.readline, b""):
+            line = line.strip()
 
-            # Value changes
-            elif not in_header:
-                self._parse_value_change(line)
-                i += 1
-            else:
-                i += 1
-
-    def _parse_timescale(self, lines, index):
+            if not line:
+                continue
+            first = line[0]
+            kind = _LINE_KINDS[first]
+
+            # Binary value: <value><identifier>
+            # Example: "0!" means signal ! changes to 0
+            if kind == _LINE_SCALAR:
+                if len(line) > 1:
+                    signal = signals.get(line[1:])
+                    if signal is not None:
+                        signal.add_change(timestamp, _SCALAR_VALUES[first])
+
+            # Timestamp: #<timestamp>
+            elif kind == _LINE_TIMESTAMP:
+                try:
+                    timestamp = int(line[1:])
+                except ValueError:
+                    continue
+                if timestamp > max_timestamp:
+                    max_timestamp = timestamp
+
+            # Bus value: b<binary_value> <identifier>
+            # Real value: r<real_value> <identifier>
+            # Example: "b1010 !" means signal ! changes to binary 1010
+            elif kind == _LINE_VECTOR:
+                parts = line.split()
+                if len(parts) >= 2:
+                    signal = signals.get(parts[1])
+                    if signal is not None:
+                        raw = parts[0][1:]
+                        value = shared_values.get(raw)
+                        if value is None:
+                            value = shared_values[raw] = raw.decode()
+                        signal.add_change(timestamp, value)
+
+            # Commands such as $dumpvars and $comment
+            elif kind == _LINE_COMMAND:
+                self._parse_command(line.decode(), buf)
+                if line.startswith(b"$var"):
+                    signals = self._signals_by_identifier()
+
+        self.current_timestamp = timestamp
+        self.data.update_max_timestamp(max_timestamp)
+
+    def _signals_by_identifier(self):
+        """Get a dict of signals keyed by their identifiers as bytes"""
+        # The identifiers are known once the definitions are read, so value
+        # change lines can be looked up without decoding each identifier
+        return {
+            identifier.encode(): signal
+            for identifier, signal in self.data.signals.items()
+        }
+
+    def _parse_timescale(self, line, buf):
         """Parse $timescale directive"""
-        line = lines[index].strip()
-
         # Extract timescale from current or next line
-        match = re.search(r"(\d+\s*\w+)", line)
+        match = _TIMESCALE_RE.search(line)
         if match:
             self.data.timescale = match.group(1).strip()
-        elif index + 1 < len(lines):
-            next_line = lines[index + 1].strip()
-            match = re.search(r"(\d+\s*\w+)", next_line)
+        else:
+            # Peek at the next line without consuming it
+            pos = buf.tell()
+            next_line = buf.readline().decode().strip()
+            buf.seek(pos)
+            match = _TIMESCALE_RE.search(next_line)
             if match:
                 self.data.timescale = match.group(1).strip()
 
-        return self._skip_to_end(lines, index)
+        self._skip_to_end(line, buf)
 
-    def _parse_scope(self, lines, index):
+    def _parse_scope(self, line, buf):
         """Parse $scope directive"""
-        line = lines[index].strip()
         parts = line.split()
 
         if len(parts) >= 3:
             scope_name = parts[2]
             self.current_scope.append(scope_name)
 
-        return index + 1
+    def _parse_upscope(self, line, buf):
+        """Parse $upscope directive"""
+        self._pop_scope()
 
     def _pop_scope(self):
         """Exit current scope"""
         if self.current_scope:
             self.current_scope.pop()
 
-    def _parse_var(self, lines, index):
+    def _parse_var(self, line, buf):
         """Parse $var directive"""
-        line = lines[index].strip()
         # Format: $var <type> <width> <identifier> <name> $end
         parts = line.split()
 
@@ -116,19 +222,29 @@ class VCDParser:
             signal = Signal(identifier, name, width, scope)
             self.data.add_signal(signal)
 
-        return self._skip_to_end(lines, index)
+        self._skip_to_end(line, buf)
+
+    def _parse_enddefinitions(self, line, buf):
+        """Ignore a repeated $enddefinitions inside the value change section"""
+        # The first one is handled by _parse_lines, which switches to
+        # parsing value changes
+
+    def _skip_to_end(self, line, buf):
+        """Skip to the line holding the $end marker of a command"""
+        if "$end" in line:
+            return
 
-    def _skip_to_end(self, lines, index):
-        """Skip to $end marker"""
-        while index < len(lines):
-            if "$end" in lines[index]:
-                return index + 1
-            index += 1
-        return index
+        # Search the buffer directly instead of reading line by line, then
+        # continue after the line the marker is on
+        end = buf.find(b"$end", buf.tell())
+        if end < 0:
+            buf.seek(0, os.SEEK_END)
+        else:
+            buf.seek(end)
+            buf.readline()
 
-    def _parse_timestamp(self, lines, index):
+    def _parse_timestamp(self, line):
         """Parse timestamp marker"""
-        line = lines[index].strip()
         # Format: #<timestamp>
         timestamp_str = line[1:]  # Remove '#'
 
@@ -137,43 +253,3 @@ class VCDParser:
             self.data.update_max_timestamp(self.current_timestamp)
         except ValueError:
             pass
-
-        return index + 1
-
-    def _parse_value_change(self, line):
-        """Parse a value change line"""
-        line = line.strip()
-
-        if not line:
-            return
-
-        # Binary value: <value><identifier>
-        # Example: "0!" means signal ! changes to 0
-        if line[0] in "01xzXZ":
-            if len(line) > 1:
-                value = line[0]
-                identifier = line[1:]
-                signal = self.data.get_signal_by_identifier(identifier)
-                if signal:
-                    signal.add_change(self.current_timestamp, value)
-
-        # Bus value: b<binary_value> <identifier>
-        # Example: "b1010 !" means signal ! changes to binary 1010
-        elif line.startswith("b") or line.startswith("B"):
-            parts = line.split()
-            if len(parts) >= 2:
-                value = parts[0][1:]  # Remove 'b' prefix
-                identifier = parts[1]
-                signal = self.data.get_signal_by_identifier(identifier)
-                if signal:
-                    signal.add_change(self.current_timestamp, value)
-
-        # Real value: r<real_value> <identifier>
-        elif line.startswith("r") or line.startswith("R"):
-            parts = line.split()
-            if len(parts) >= 2:
-                value = parts[0][1:]  # Remove 'r' prefix
-                identifier = parts[1]
-                signal = self.data.get_signal_by_identifier(identifier)
-                if signal:
-                    signal.add_change(self.current_timestamp, value)
@@ -3,6 +3,8 @@ VCD Waveform Viewer - Main Viewer Window
 Main application window with menu and canvas
 """
 
+import os
+import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from parser import VCDParser
@@ -10,6 +12,15 @@ from canvas import WaveformCanvas
 from models import WaveformData
 
 
+def _fuzzy_pattern(text):
+    """Compile a pattern matching names containing text's characters in order"""
+    # Each character is reached by skipping only other characters, so a
+    # failed match never has to backtrack through the name
+    return re.compile(
+        "".join(f"[^{re.escape(char)}]*{re.escape(char)}" for char in text)
+    )
+
+
 class WaveformViewer:
     """Main application window"""
 
@@ -22,9 +33,20 @@ class WaveformViewer:
         self.parser = VCDParser()
         self.canvas = None
         self.signal_listbox = None
+        self.signal_menu = None
+        self._context_signal = None  # Signal the context menu was opened on
         self.search_var = None
+        self._search_after_id = None  # Pending deferred search filter, if any
         self.file_loaded = False
         self.drag_data = {"index": None, "source": None}
+        self._drag_motion_after_id = None  # Pending drag motion update, if any
+        self._signal_names = []  # Full names of all signals, in sorted order
+        self._signal_names_lower = []  # The same names lower-cased for search
+        self._signal_index = {}  # Dict: full name -> position in _signal_names
+        self._selected_names = set()  # Names selected at the last selection
+        self._display_order_synced = False  # display_order matches the list rows
+        self._min_time_scale = 0.0  # Zoom that keeps the timeline 50 px wide
+        self._loaded_file_key = None  # (path, mtime, size) of the parsed file
 
         self._create_menu()
         self._create_toolbar()
@@ -173,7 +195,7 @@ class WaveformViewer:
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         tk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", self._on_search)
+        self.search_var.trace_add("write", self._on_search)
         tk.Entry(search_frame, textvariable=self.search_var).pack(
             side=tk.LEFT, fill=tk.X, expand=True, padx=5
         )
@@ -194,6 +216,7 @@ class WaveformViewer:
         self.signal_listbox.bind("<<ListboxSelect>>", self._on_signal_select)
 
         # Right-click menu for signals
+        self._create_signal_menu()
         self.signal_listbox.bind("<Button-3>", self._show_signal_context_menu)
 
         # Drag and drop for reordering
@@ -241,19 +264,33 @@ class WaveformViewer:
         """Load and parse VCD file"""
         try:
             self.status_bar.config(text=f"Loading {filename}...")
-            self.root.update()
-
-            # Parse the file
-            self.waveform_data = self.parser.parse_file(filename)
+            self.root.update_idletasks()
+
+            # Reopening the loaded file while it is unchanged reuses the parsed
+            # data, resetting only its display state, instead of parsing again
+            stat = os.stat(filename)
+            file_key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+            reused = file_key == self._loaded_file_key
+            if reused:
+                self.waveform_data.reset_view()
+                self.canvas.invalidate()
+            else:
+                # Parse the file
+                self.waveform_data = self.parser.parse_file(filename)
+                self._loaded_file_key = file_key
 
             # Update canvas with new data
             self.canvas.waveform_data = self.waveform_data
 
+            # Minimum zoom to keep at least 50 pixels for entire timeline
+            max_time = self.waveform_data.max_timestamp
+            self._min_time_scale = 50.0 / max_time if max_time > 0 else 0.0
+
             # Calculate initial zoom to fit
             self._calculate_fit_zoom()
 
-            # Draw waveforms
-            self.canvas.draw_waveforms()
+            # Draw waveforms once the rest of the load is done
+            self.canvas.request_redraw()
 
             # Update status
             signal_count = len(self.waveform_data.signals)
@@ -263,13 +300,6 @@ class WaveformViewer:
                 f"Time: 0 to {max_time} {self.waveform_data.timescale}"
             )
 
-            messagebox.showinfo(
-                "Success",
-                f"Successfully loaded VCD file!\n\n"
-                f"Signals: {signal_count}\n"
-                f"Max Time: {max_time} {self.waveform_data.timescale}",
-            )
-
             # Populate signal listbox
             self._populate_signal_list()
 
@@ -292,8 +322,8 @@ class WaveformViewer:
     def _calculate_fit_zoom(self):
         """Calculate zoom level to fit all waveforms"""
         if self.waveform_data.max_timestamp > 0:
-            # Get canvas width (minus margins)
-            canvas_width = self.canvas.canvas.winfo_width()
+            # Get canvas width (minus margins), as tracked by the canvas
+            canvas_width = self.canvas.view_width
             if canvas_width <= 1:
                 canvas_width = 1000  # Default if not yet rendered
 
@@ -305,8 +335,8 @@ class WaveformViewer:
     def zoom_in(self):
         """Zoom in (increase time scale)"""
         if self.canvas and self.waveform_data.max_timestamp > 0:
-            self.canvas.time_scale *= 1.5
-            self.canvas.draw_waveforms()
+            # Redraws are deferred, so repeated zoom steps cost a single draw
+            self.canvas.set_time_scale(self.canvas.time_scale * 1.5)
             self.status_bar.config(text=f"Zoom: {self.canvas.time_scale:.6f}x")
 
     def zoom_out(self):
@@ -314,18 +344,16 @@ class WaveformViewer:
         if self.canvas and self.waveform_data.max_timestamp > 0:
             new_scale = self.canvas.time_scale / 1.5
 
-            # Calculate minimum zoom to keep at least 50 pixels for entire timeline
-            min_scale = 50.0 / self.waveform_data.max_timestamp
+            # Minimum zoom, computed once when the file was loaded
+            min_scale = self._min_time_scale
 
             # Apply the new scale if it's above the minimum
             if new_scale >= min_scale:
-                self.canvas.time_scale = new_scale
-                self.canvas.draw_waveforms()
+                self.canvas.set_time_scale(new_scale)
                 self.status_bar.config(text=f"Zoom: {self.canvas.time_scale:.6f}x")
             else:
                 # Set to minimum and show message
-                self.canvas.time_scale = min_scale
-                self.canvas.draw_waveforms()
+                self.canvas.set_time_scale(min_scale)
                 self.status_bar.config(
                     text=f"Minimum zoom reached ({self.canvas.time_scale:.6f}x)"
                 )
@@ -334,13 +362,14 @@ class WaveformViewer:
         """Zoom to fit all waveforms"""
         if self.canvas:
             self._calculate_fit_zoom()
-            self.canvas.draw_waveforms()
+            self.canvas.request_redraw()
             self.status_bar.config(text=f"Zoom: Fit")
 
     def refresh_display(self):
         """Refresh the waveform display"""
         if self.canvas:
-            self.canvas.draw_waveforms()
+            self.canvas.invalidate()
+            self.canvas.request_redraw()
             self.status_bar.config(text="Display refreshed")
 
     def show_about(self):
@@ -365,39 +394,50 @@ class WaveformViewer:
         """Populate the signal listbox with all signals"""
         self.signal_listbox.delete(0, tk.END)
 
+        # Names are looked up once per file rather than on every selection
+        # change or search
         signals = self.waveform_data.get_all_signals()
+        self._signal_names = [signal.get_full_name() for signal in signals]
+        self._signal_names_lower = [name.lower() for name in self._signal_names]
+        self._signal_index = {name: i for i, name in enumerate(self._signal_names)}
 
         # Initialize display order
-        self.waveform_data.display_order = []
+        self.waveform_data.display_order = list(self._signal_names)
+        self._display_order_synced = True
 
-        for i, signal in enumerate(signals):
-            signal_name = signal.get_full_name()
-            self.signal_listbox.insert(tk.END, signal_name)
-            self.waveform_data.display_order.append(signal_name)
-            # Select all by default
-            self.signal_listbox.select_set(i)
+        # One insert call for all names rather than one per name, then
+        # select all by default
+        if self._signal_names:
+            self.signal_listbox.insert(tk.END, *self._signal_names)
+            self.signal_listbox.select_set(0, tk.END)
+        self._selected_names = set(self._signal_names)
 
     def _on_signal_select(self, event):
         """Handle signal selection changes"""
         if not self.waveform_data:
             return
 
-        # Get currently displayed signals in listbox
-        displayed_signals = []
-        for i in range(self.signal_listbox.size()):
-            displayed_signals.append(self.signal_listbox.get(i))
+        # Get currently displayed signals in listbox with a single call
+        displayed_signals = self.signal_listbox.get(0, tk.END)
 
         # Get selected indices
         selected_indices = self.signal_listbox.curselection()
-        selected_names = set(displayed_signals[i] for i in selected_indices)
+        selected_names = {displayed_signals[i] for i in selected_indices}
+
+        # Only signals whose selection changed need their visibility updated,
+        # and nothing needs redrawing if none did
+        changed_names = selected_names ^ self._selected_names
+        if not changed_names:
+            return
+        self._selected_names = selected_names
 
-        # Update visibility for ALL signals based on their names
-        all_signals = self.waveform_data.get_all_signals()
-        for signal in all_signals:
-            signal.visible = signal.get_full_name() in selected_names
+        for name in changed_names:
+            signal = self.waveform_data.get_signal_by_name(name)
+            if signal:
+                signal.visible = name in selected_names
 
-        # Redraw
-        self.canvas.draw_waveforms()
+        # Redraw once the burst of selection events is over
+        self.canvas.request_redraw()
 
     def _select_all_signals(self):
         """Select all signals in the listbox"""
@@ -410,42 +450,115 @@ class WaveformViewer:
         self._on_signal_select(None)
 
     def _on_search(self, *args):
+        """Filter signals once the search text stops changing"""
+        # Every keystroke changes the search text, so the list is only
+        # rebuilt after typing pauses rather than once per character
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(150, self._apply_search)
+
+    def _apply_search(self):
         """Filter signals based on search text"""
+        self._search_after_id = None
         if not self.waveform_data:
             return
 
         search_text = self.search_var.get().lower()
+        listbox = self.signal_listbox
+        displayed = listbox.get(0, tk.END)
+
+        # Positions of the matching signals in the sorted name list; an empty
+        # search matches every signal, so clearing it skips the name tests.
+        # Names match when they contain the search characters in order, not
+        # necessarily next to each other (e.g. "cdat" finds "cpu.data")
+        if search_text:
+            match = _fuzzy_pattern(search_text).match
+            filtered_indices = [
+                i
+                for i, name_lower in enumerate(self._signal_names_lower)
+                if match(name_lower)
+            ]
+        else:
+            filtered_indices = list(range(len(self._signal_names)))
+
+        # While the list still shows signals in sorted order, only the rows
+        # entering or leaving the filter are inserted or deleted, which also
+        # keeps the selection and scroll position of the other rows
+        shown_indices = [self._signal_index.get(name, -1) for name in displayed]
+        if -1 not in shown_indices and all(
+            a < b for a, b in zip(shown_indices, shown_indices[1:])
+        ):
+            if filtered_indices != shown_indices:
+                self._update_signal_rows(shown_indices, filtered_indices)
+                self._display_order_synced = False
+            return
 
-        # Save currently selected signals before clearing listbox
-        selected_signals = set()
-        signals = self.waveform_data.get_all_signals()
-        for i in self.signal_listbox.curselection():
-            if i < self.signal_listbox.size():
-                selected_signals.add(self.signal_listbox.get(i))
-
-        self.signal_listbox.delete(0, tk.END)
-
-        # Re-populate with filtered signals and restore selections
-        for signal in signals:
-            if search_text in signal.get_full_name().lower():
-                idx = self.signal_listbox.size()
-                self.signal_listbox.insert(tk.END, signal.get_full_name())
-                # Re-select if it was previously selected
-                if signal.get_full_name() in selected_signals:
-                    self.signal_listbox.select_set(idx)
+        # Otherwise (e.g. after rows were dragged) rebuild the whole list,
+        # saving currently selected signals before clearing it
+        selected_signals = {displayed[i] for i in listbox.curselection()}
+        listbox.delete(0, tk.END)
+        self._display_order_synced = False
+
+        # Re-populate with filtered signals in one call
+        filtered = [self._signal_names[i] for i in filtered_indices]
+        if filtered:
+            listbox.insert(tk.END, *filtered)
+
+        # Re-select signals that were previously selected, one call per run
+        # of consecutive entries rather than one per entry
+        select_set = listbox.select_set
+        run_start = None
+        for idx, name in enumerate(filtered):
+            if name in selected_signals:
+                if run_start is None:
+                    run_start = idx
+            elif run_start is not None:
+                select_set(run_start, idx - 1)
+                run_start = None
+        if run_start is not None:
+            select_set(run_start, len(filtered) - 1)
+
+    def _update_signal_rows(self, shown_indices, filtered_indices):
+        """Turn the listed signals into the filtered ones, one call per run"""
+        # Both lists hold ascending positions in the sorted name list; a
+        # sentinel past the end of both makes them finish together
+        names = self._signal_names
+        listbox = self.signal_listbox
+        end = len(names)
+        shown_indices = shown_indices + [end]
+        filtered_indices = filtered_indices + [end]
+        row = i = j = 0
+        while shown_indices[i] != end or filtered_indices[j] != end:
+            if shown_indices[i] < filtered_indices[j]:
+                # Run of rows no longer matching
+                start = i
+                while shown_indices[i] < filtered_indices[j]:
+                    i += 1
+                listbox.delete(row, row + i - start - 1)
+            elif filtered_indices[j] < shown_indices[i]:
+                # Run of newly matching signals
+                start = j
+                while filtered_indices[j] < shown_indices[i]:
+                    j += 1
+                listbox.insert(row, *[names[k] for k in filtered_indices[start:j]])
+                row += j - start
+            else:
+                i += 1
+                j += 1
+                row += 1
 
     def toggle_cursor(self):
         """Toggle cursor visibility"""
         if self.waveform_data.cursor:
             self.waveform_data.cursor.visible = not self.waveform_data.cursor.visible
-            self.canvas.draw_waveforms()
+            self.canvas.request_overlay(markers=False)
             status = "visible" if self.waveform_data.cursor.visible else "hidden"
             self.status_bar.config(text=f"Cursor {status}")
 
     def clear_markers(self):
         """Clear all markers"""
         self.waveform_data.markers.clear()
-        self.canvas.draw_waveforms()
+        self.canvas.request_overlay()
         self.status_bar.config(text="All markers cleared")
         self.delta_label.config(text="")
 
@@ -479,7 +592,7 @@ class WaveformViewer:
     def _on_time_base_change(self, event=None):
         """Handle time base selection change"""
         self.waveform_data.time_base = self.time_base_var.get()
-        self.canvas.draw_waveforms()
+        self.canvas.request_redraw()
         self.status_bar.config(text=f"Time base: {self.waveform_data.time_base}")
 
     def _show_signal_context_menu(self, event):
@@ -499,7 +612,18 @@ class WaveformViewer:
         if not signal:
             return
 
-        # Create context menu
+        # The menu commands act on whichever signal was clicked last
+        self._context_signal = signal
+
+        # Display menu at mouse position
+        try:
+            self.signal_menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.signal_menu.grab_release()
+
+    def _create_signal_menu(self):
+        """Create the right-click context menu for signals"""
+        # Built once and reused for every right-click
         menu = tk.Menu(self.root, tearoff=0)
 
         # Color submenu
@@ -521,36 +645,39 @@ class WaveformViewer:
         for color_name, color_value in colors:
             color_menu.add_command(
                 label=color_name,
-                command=lambda s=signal, c=color_value: self._change_signal_color(s, c),
+                command=lambda c=color_value: self._change_signal_color(
+                    self._context_signal, c
+                ),
             )
 
         menu.add_cascade(label="Change Color", menu=color_menu)
         menu.add_separator()
-        menu.add_command(label="Hide Signal", command=lambda: self._hide_signal(signal))
-
-        # Display menu at mouse position
-        try:
-            menu.tk_popup(event.x_root, event.y_root)
-        finally:
-            menu.grab_release()
+        menu.add_command(
+            label="Hide Signal",
+            command=lambda: self._hide_signal(self._context_signal),
+        )
+        self.signal_menu = menu
 
     def _change_signal_color(self, signal, color):
         """Change signal display color"""
         if signal:
             signal.color = color
-            self.canvas.draw_waveforms()
+            self.waveform_data.mark_dirty(signal)
+            self.canvas.request_redraw()
             self.status_bar.config(text=f"Changed {signal.get_full_name()} to {color}")
 
     def _hide_signal(self, signal):
         """Hide a signal"""
         if signal:
             signal.visible = False
-            # Clear selection for this signal in listbox
-            for i in range(self.signal_listbox.size()):
-                if self.signal_listbox.get(i) == signal.get_full_name():
-                    self.signal_listbox.selection_clear(i)
-                    break
-            self.canvas.draw_waveforms()
+            self._selected_names.discard(signal.get_full_name())
+            # Clear selection for this signal in listbox, fetching the names
+            # with one call rather than one per row
+            displayed = self.signal_listbox.get(0, tk.END)
+            if signal.get_full_name() in displayed:
+                index = displayed.index(signal.get_full_name())
+                self.signal_listbox.selection_clear(index)
+            self.canvas.request_redraw()
             self.status_bar.config(text=f"Hidden {signal.get_full_name()}")
 
     def _on_drag_start(self, event):
@@ -571,8 +698,25 @@ class WaveformViewer:
         if abs(event.y - self.drag_data.get("start_y", 0)) < 5:
             return
 
-        widget = event.widget
-        index = widget.nearest(event.y)
+        # Motion events arrive for every pixel moved, so only the latest
+        # position is handled, at most once per frame (about 60 Hz)
+        self.drag_data["motion_y"] = event.y
+        if self._drag_motion_after_id is None:
+            self._drag_motion_after_id = self.root.after(
+                16, self._apply_drag_motion, event.widget
+            )
+
+    def _apply_drag_motion(self, widget):
+        """Handle the latest drag motion"""
+        self._drag_motion_after_id = None
+        if self.drag_data["source"] is None:
+            return
+
+        motion_y = self.drag_data.get("motion_y")
+        if motion_y is None:
+            return
+
+        index = widget.nearest(motion_y)
 
         # Visual feedback - highlight target position
         if index >= 0 and index != self.drag_data.get("last_index"):
@@ -590,16 +734,13 @@ class WaveformViewer:
         # Check if this was actually a drag (moved more than 5 pixels)
         if abs(event.y - self.drag_data.get("start_y", 0)) < 5:
             # This was a click, not a drag - let selection handle it
-            self.drag_data = {"index": None, "source": None}
+            self._reset_drag()
             return
 
         if target_index >= 0 and source_index >= 0 and source_index != target_index:
-            # Get all current selections
-            selected_indices = list(self.signal_listbox.curselection())
-
             # Get the item being moved
             source_item = self.signal_listbox.get(source_index)
-            was_selected = source_index in selected_indices
+            was_selected = self.signal_listbox.selection_includes(source_index)
 
             # Remove from old position
             self.signal_listbox.delete(source_index)
@@ -611,51 +752,39 @@ class WaveformViewer:
             # Insert at new position
             self.signal_listbox.insert(target_index, source_item)
 
-            # Restore selection state
+            # Restore selection state; the other rows keep theirs, as the
+            # listbox moves selections along with deleted and inserted rows
             if was_selected:
                 self.signal_listbox.selection_set(target_index)
 
-            # Update other selections
-            for idx in selected_indices:
-                if idx != source_index:
-                    # Adjust index based on move
-                    if source_index < idx <= target_index:
-                        new_idx = idx - 1
-                    elif target_index <= idx < source_index:
-                        new_idx = idx + 1
-                    else:
-                        new_idx = idx
-
-                    try:
-                        self.signal_listbox.selection_set(new_idx)
-                    except:
-                        pass
-
-            # Force update of display order and redraw
-            self._update_display_order()
-            self.canvas.draw_waveforms()
+            # While display_order mirrors the list rows, the move is applied
+            # to it directly rather than reading every row back
+            if self._display_order_synced:
+                order = self.waveform_data.display_order
+                order.insert(target_index, order.pop(source_index))
+            else:
+                self._update_display_order()
+            self.canvas.request_redraw()
+
+        self._reset_drag()
 
+    def _reset_drag(self):
+        """Forget the current drag, including any pending motion update"""
+        if self._drag_motion_after_id is not None:
+            self.root.after_cancel(self._drag_motion_after_id)
+            self._drag_motion_after_id = None
         self.drag_data = {"index": None, "source": None}
 
     def _update_display_order(self):
         """Update the display order from current listbox state"""
-        new_order = []
-        for i in range(self.signal_listbox.size()):
-            new_order.append(self.signal_listbox.get(i))
-        self.waveform_data.display_order = new_order
-
-        # Verify the order is set correctly
-        test_ordered = self.waveform_data.get_signals_in_display_order()
-        if test_ordered:
-            print(f"TEST: First signal should be: {new_order[0]}")
-            print(f"TEST: First signal actually is: {test_ordered[0].get_full_name()}")
-            print(f"TEST: Match: {new_order[0] == test_ordered[0].get_full_name()}")
+        # One call for all names rather than one per row
+        self.waveform_data.display_order = list(self.signal_listbox.get(0, tk.END))
+        self._display_order_synced = True
 
     def delete_selected_markers(self):
         """Delete selected markers"""
         selected = self.waveform_data.get_selected_markers()
-        for marker in selected:
-            self.waveform_data.remove_marker(marker)
-        self.canvas.draw_waveforms()
+        self.waveform_data.remove_markers(selected)
+        self.canvas.request_overlay()
         self.status_bar.config(text=f"Deleted {len(selected)} marker(s)")
         self.delta_label.config(text="")